@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
 class Pet(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_name(self):
         pass
@@ -10,6 +12,8 @@ class Pet(ABC):
         pass
 
 class Parrot(Pet):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
     
@@ -20,6 +24,8 @@ class Parrot(Pet):
         return "Попугай говорит"
 
 class Turtle(Pet):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
     
@@ -30,6 +36,8 @@ class Turtle(Pet):
         return "Черепаха издает звук"
 
 class Person:
+    __slots__ = ('name', 'pet')
+
     def __init__(self, name, pet):
         self.name = name
         self.pet = pet
@@ -42,14 +50,17 @@ class Person:
         print(f"Звук: {pet_sound}")
         print("-" * 20)
 
-parrot = Parrot("Кеша")
-turtle = Turtle("Лео")
+def main():
+    parrot = Parrot("Кеша")
+    turtle = Turtle("Лео")
 
-person1 = Person("Иван", parrot)
-person2 = Person("Мария", turtle)
-    
-person1.get_pet_info()
-person2.get_pet_info()
-input()
+    person1 = Person("Иван", parrot)
+    person2 = Person("Мария", turtle)
+
+    person1.get_pet_info()
+    person2.get_pet_info()
+    input()
 
 
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,26 @@
+# PERF: горячий путь здесь упирается в интерпретатор и аллокации, а не в вычисления.
+# Интерактивный цикл боя в main() ждет input(), остальное время уходит на
+# Enemy.__init__, конструкторы оружия/брони и PlayableCharacter.take_damage.
+# Числовых массивов нет, поэтому SIMD/GPU не применимы. Имеет смысл только:
+#   3) Python -> NumPy/Numba, и только для пакетной симуляции боев
+#      (точка входа - sim.simulate_battles);
+#   4) раскладка данных: flyweight для снаряжения, __slots__;
+#   6) специализация и кеширование: таблицы диспетчеризации, предвычисленные константы.
+# ABC оставлены: ABCMeta не переопределяет __call__, проверка абстрактности при
+# создании объекта - один флаг в C, замер Goblin() с ABC и без него в пределах шума.
 from abc import ABC, abstractmethod
 from enum import Enum
 import random
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для пакетного расчета урона
+    np = None
+
+# Общий генератор случайных чисел, метод привязан заранее
+_RNG = random.Random()
+_random = _RNG.random
 
 
 # ===== 1. SINGLETON =====
@@ -9,19 +29,22 @@ class GameLogger:
     Паттерн Одиночка - гарантирует, что у класса есть только один экземпляр
     """
     _instance = None
+    enabled = True
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
-        if not hasattr(self, '_initialized'):
-            self._initialized = True
-
     def log(self, message: str):
         """Метод для логирования игровых событий"""
-        print(f"[GAME LOG]: {message}")
+        if self.enabled:
+            sys.stdout.write("[GAME LOG]: " + message + "\n")
+
+    def log_batch(self, messages):
+        """Логирование нескольких событий одной записью"""
+        if self.enabled:
+            sys.stdout.write("".join("[GAME LOG]: " + message + "\n" for message in messages))
 
 
 # ===== 2. ENUMS =====
@@ -36,9 +59,17 @@ class CharacterClass(Enum):
         return self.value
 
 
+_CLASS_NAMES = tuple(cls.name for cls in CharacterClass)
+# Строка выбора класса собирается один раз, вид для игрока прежний: ['WARRIOR', ...]
+_CLASS_PROMPT = f"Выберите класс из списка: {list(_CLASS_NAMES)}"
+
+
 # ===== 3. ABSTRACT INTERFACES =====
 class Weapon(ABC):
     """Абстрактный класс оружия"""
+    __slots__ = ()
+
+    _logger = GameLogger()
 
     @abstractmethod
     def get_damage(self) -> int:
@@ -51,6 +82,10 @@ class Weapon(ABC):
 
 class Armor(ABC):
     """Абстрактный класс брони"""
+    __slots__ = ()
+
+    _logger = GameLogger()
+    _mitigation = 1.0  # доля урона, проходящая через броню
 
     @abstractmethod
     def get_defense(self) -> float:
@@ -63,12 +98,14 @@ class Armor(ABC):
 
 class Enemy(ABC):
     """Абстрактный класс врага"""
+    __slots__ = ('_name', '_health', '_damage')
+
+    _logger = GameLogger()
 
     def __init__(self):
         self._name = ""
         self._health = 0
         self._damage = 0
-        self._logger = GameLogger()
 
     @property
     def name(self):
@@ -93,51 +130,70 @@ class Enemy(ABC):
 # ===== 4. WEAPON IMPLEMENTATIONS =====
 class Sword(Weapon):
     """Меч - оружие воина"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._damage = 20
-        self._logger = GameLogger()
+    _damage = 20
 
     def get_damage(self) -> int:
         return self._damage
 
+    def get_damage_batch(self, rng, size):
+        """Урон size ударов одним вызовом (для пакетной симуляции)"""
+        if np is None:
+            raise RuntimeError("Для пакетного расчета урона нужен numpy")
+        return np.full(size, self._damage, dtype=np.int64)
+
     def use(self):
         self._logger.log("Удар мечом!")
 
 
 class Bow(Weapon):
     """Лук - оружие вора"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._damage = 15
-        self._critical_chance = 0.3
-        self._critical_modifier = 2
-        self._logger = GameLogger()
+    _damage = 15
+    _critical_chance = 0.3
+    _critical_modifier = 2
 
     def get_damage(self) -> int:
-        roll = random.random()
+        roll = _random()
         if roll <= self._critical_chance:
             self._logger.log("Критический урон!")
             return self._damage * self._critical_modifier
         return self._damage
 
+    def get_damage_batch(self, rng, size):
+        """Урон size выстрелов одним вызовом (для пакетной симуляции, без логов).
+        rng - numpy.random.Generator, чтобы броски можно было зафиксировать seed"""
+        if np is None:
+            raise RuntimeError("Для пакетного расчета урона нужен numpy")
+        crits = rng.random(size) <= self._critical_chance
+        return np.where(crits, self._damage * self._critical_modifier, self._damage).astype(np.int64)
+
     def use(self):
         self._logger.log("Выстрел из лука!")
 
 
 class Staff(Weapon):
     """Посох - оружие мага"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._damage = 25
-        self._scatter = 0.2
-        self._logger = GameLogger()
+    _damage = 25
+    _scatter = 0.2
 
     def get_damage(self) -> int:
-        roll = random.random()
+        roll = _random()
         factor = 1 + (roll * 2 * self._scatter - self._scatter)
         return round(self._damage * factor)
 
+    def get_damage_batch(self, rng, size):
+        """Урон size ударов одним вызовом (для пакетной симуляции).
+        rng - numpy.random.Generator, чтобы броски можно было зафиксировать seed"""
+        if np is None:
+            raise RuntimeError("Для пакетного расчета урона нужен numpy")
+        factors = 1 + (rng.random(size) * 2 - 1) * self._scatter
+        return np.rint(self._damage * factors).astype(np.int64)
+
     def use(self):
         self._logger.log("Воздух накаляется, из посоха вылетает огненный шар!")
 
@@ -145,10 +201,10 @@ class Staff(Weapon):
 # ===== 5. ARMOR IMPLEMENTATIONS =====
 class HeavyArmor(Armor):
     """Тяжелая броня"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._defense = 0.3
-        self._logger = GameLogger()
+    _defense = 0.3
+    _mitigation = 1 - _defense
 
     def get_defense(self) -> float:
         return self._defense
@@ -159,10 +215,10 @@ class HeavyArmor(Armor):
 
 class LightArmor(Armor):
     """Легкая броня"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._defense = 0.2
-        self._logger = GameLogger()
+    _defense = 0.2
+    _mitigation = 1 - _defense
 
     def get_defense(self) -> float:
         return self._defense
@@ -173,10 +229,10 @@ class LightArmor(Armor):
 
 class Robe(Armor):
     """Роба мага"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._defense = 0.1
-        self._logger = GameLogger()
+    _defense = 0.1
+    _mitigation = 1 - _defense
 
     def get_defense(self) -> float:
         return self._defense
@@ -185,22 +241,35 @@ class Robe(Armor):
         self._logger.log("Роба блокирует немного урона")
 
 
+# Снаряжение не хранит состояния, поэтому все персонажи делят
+# один экземпляр каждого вида (паттерн Приспособленец)
+SWORD = Sword()
+BOW = Bow()
+STAFF = Staff()
+HEAVY_ARMOR = HeavyArmor()
+LIGHT_ARMOR = LightArmor()
+ROBE = Robe()
+
+
 # ===== 6. BUILDER PATTERN =====
 class PlayableCharacter:
     """
     Паттерн Строитель - для создания сложных объектов пошагово
     """
+    __slots__ = ('_name', '_character_class', '_weapon', '_armor', '_health')
+
+    _logger = GameLogger()
 
-    def __init__(self, builder):
-        self._logger = GameLogger()
-        self._name = builder._name
-        self._character_class = builder._character_class
-        self._weapon = builder._weapon
-        self._armor = builder._armor
-        self._health = builder._character_class.starting_health
+    def __init__(self, name: str, character_class: CharacterClass, weapon: Weapon, armor: Armor):
+        self._name = name
+        self._character_class = character_class
+        self._weapon = weapon
+        self._armor = armor
+        self._health = character_class.value  # значение класса - стартовое здоровье
 
     class Builder:
         """Внутренний класс-строитель"""
+        __slots__ = ('_name', '_character_class', '_weapon', '_armor')
 
         def __init__(self):
             self._name = None
@@ -226,7 +295,7 @@ class PlayableCharacter:
 
         def build(self):
             """Создаем финальный объект"""
-            return PlayableCharacter(self)
+            return PlayableCharacter(self._name, self._character_class, self._weapon, self._armor)
 
     @property
     def name(self):
@@ -238,21 +307,24 @@ class PlayableCharacter:
 
     def take_damage(self, damage: int):
         """Логика получения урона"""
-        reduced_damage = round(damage * (1 - self._armor.get_defense()))
+        reduced_damage = round(damage * self._armor._mitigation)
         reduced_damage = max(0, reduced_damage)
 
         self._health -= reduced_damage
         self._armor.use()
-        self._logger.log(f"{self._name} получил урон: {reduced_damage}")
 
-        if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+        if self._logger.enabled:
+            self._logger.log(f"{self._name} получил урон: {reduced_damage}")
+            if self._health > 0:
+                self._logger.log(f"У {self._name} осталось {self._health} здоровья")
 
     def attack(self, enemy: Enemy):
         """Атака врага"""
-        self._logger.log(f"{self._name} атакует врага {enemy.name}")
-        self._weapon.use()
-        enemy.take_damage(self._weapon.get_damage())
+        if self._logger.enabled:
+            self._logger.log(f"{self._name} атакует врага {enemy.name}")
+        weapon = self._weapon
+        weapon.use()
+        enemy.take_damage(weapon.get_damage())
 
     def is_alive(self):
         return self._health > 0
@@ -261,6 +333,7 @@ class PlayableCharacter:
 # ===== 7. ABSTRACT FACTORY =====
 class EquipmentChest(ABC):
     """Абстрактная фабрика для создания снаряжения"""
+    __slots__ = ()
 
     @abstractmethod
     def get_weapon(self) -> Weapon:
@@ -273,36 +346,41 @@ class EquipmentChest(ABC):
 
 class WarriorEquipmentChest(EquipmentChest):
     """Фабрика для снаряжения воина"""
+    __slots__ = ()
 
     def get_weapon(self) -> Weapon:
-        return Sword()
+        return SWORD
 
     def get_armor(self) -> Armor:
-        return HeavyArmor()
+        return HEAVY_ARMOR
 
 
 class ThiefEquipmentChest(EquipmentChest):
     """Фабрика для снаряжения вора"""
+    __slots__ = ()
 
     def get_weapon(self) -> Weapon:
-        return Bow()
+        return BOW
 
     def get_armor(self) -> Armor:
-        return LightArmor()
+        return LIGHT_ARMOR
 
 
 class MagicalEquipmentChest(EquipmentChest):
     """Фабрика для снаряжения мага"""
+    __slots__ = ()
 
     def get_weapon(self) -> Weapon:
-        return Staff()
+        return STAFF
 
     def get_armor(self) -> Armor:
-        return Robe()
+        return ROBE
 
 
 # ===== 8. ENEMY IMPLEMENTATIONS =====
 class Goblin(Enemy):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self._name = "Гоблин"
@@ -310,30 +388,37 @@ class Goblin(Enemy):
         self._damage = 10
 
     def take_damage(self, damage: int):
-        self._logger.log(f"{self._name} получает {damage} урона!")
         self._health -= damage
-        if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+        if self._logger.enabled:
+            self._logger.log(f"{self._name} получает {damage} урона!")
+            if self._health > 0:
+                self._logger.log(f"У {self._name} осталось {self._health} здоровья")
 
     def attack(self, player):
-        self._logger.log(f"{self._name} атакует {player.name}!")
+        if self._logger.enabled:
+            self._logger.log(f"{self._name} атакует {player.name}!")
         player.take_damage(self._damage)
 
 
 class Dragon(Enemy):
+    __slots__ = ()
+
+    _resistance = 0.2
+    _damage_multiplier = 1 - _resistance
+
     def __init__(self):
         super().__init__()
         self._name = "Дракон"
-        self._resistance = 0.2
         self._health = 100
         self._damage = 30
 
     def take_damage(self, damage: int):
-        damage = round(damage * (1 - self._resistance))
-        self._logger.log(f"{self._name} получает {damage} урона!")
+        damage = round(damage * self._damage_multiplier)
         self._health -= damage
-        if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+        if self._logger.enabled:
+            self._logger.log(f"{self._name} получает {damage} урона!")
+            if self._health > 0:
+                self._logger.log(f"У {self._name} осталось {self._health} здоровья")
 
     def attack(self, player):
         self._logger.log("Дракон дышит огнем!")
@@ -343,9 +428,9 @@ class Dragon(Enemy):
 # ===== 9. FACTORY METHOD =====
 class Location(ABC):
     """Абстрактный класс локации с фабричным методом"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._game_logger = GameLogger()
+    _game_logger = GameLogger()
 
     def enter_location(self, player) -> Enemy:
         """Общая логика входа в локацию"""
@@ -367,6 +452,8 @@ class Location(ABC):
 
 
 class Forest(Location):
+    __slots__ = ()
+
     def spawn_enemy(self) -> Enemy:
         return Goblin()  # Реализация фабричного метода
 
@@ -375,6 +462,8 @@ class Forest(Location):
 
 
 class DragonBarrow(Location):
+    __slots__ = ()
+
     def spawn_enemy(self) -> Enemy:
         return Dragon()  # Реализация фабричного метода
 
@@ -400,8 +489,8 @@ def test_builder():
     character = (PlayableCharacter.Builder()
                  .set_name("Антон")
                  .set_character_class(CharacterClass.WARRIOR)
-                 .set_weapon(Sword())
-                 .set_armor(HeavyArmor())
+                 .set_weapon(SWORD)
+                 .set_armor(HEAVY_ARMOR)
                  .build())
 
     print(f"Создан персонаж: {character.name}")
@@ -412,13 +501,7 @@ def test_builder():
 def test_abstract_factory():
     """Демонстрация работы Абстрактной фабрики"""
     print("=== Демонстрация Abstract Factory ===")
-    factories = {
-        CharacterClass.WARRIOR: WarriorEquipmentChest(),
-        CharacterClass.THIEF: ThiefEquipmentChest(),
-        CharacterClass.MAGE: MagicalEquipmentChest()
-    }
-
-    for char_class, factory in factories.items():
+    for char_class, factory in _CHESTS.items():
         weapon = factory.get_weapon()
         armor = factory.get_armor()
         print(f"{char_class.name}: {weapon.__class__.__name__} + {armor.__class__.__name__}")
@@ -437,23 +520,27 @@ def test_factory_method():
 
 
 # ===== 11. MAIN GAME LOGIC =====
+# Фабрики и локации не хранят состояния, поэтому таблицы строятся один раз
+_CHESTS = {
+    CharacterClass.WARRIOR: WarriorEquipmentChest(),
+    CharacterClass.THIEF: ThiefEquipmentChest(),
+    CharacterClass.MAGE: MagicalEquipmentChest()
+}
+
+_LOCATIONS = {
+    "мистический лес": Forest(),
+    "логово дракона": DragonBarrow()
+}
+
+
 def get_chest(character_class: CharacterClass) -> EquipmentChest:
     """Фабричный метод для получения сундука снаряжения"""
-    chests = {
-        CharacterClass.WARRIOR: WarriorEquipmentChest(),
-        CharacterClass.THIEF: ThiefEquipmentChest(),
-        CharacterClass.MAGE: MagicalEquipmentChest()
-    }
-    return chests.get(character_class)
+    return _CHESTS.get(character_class)
 
 
 def get_location(location_name: str) -> Location:
     """Фабричный метод для получения локации"""
-    locations = {
-        "мистический лес": Forest(),
-        "логово дракона": DragonBarrow()
-    }
-    return locations.get(location_name.lower())
+    return _LOCATIONS.get(location_name.lower())
 
 
 def main():
@@ -463,12 +550,11 @@ def main():
 
     name = input("Введите имя: ")
 
-    print("Выберите класс из списка:", [cls.name for cls in CharacterClass])
+    print(_CLASS_PROMPT)
     class_name = input().upper()
 
-    try:
-        character_class = CharacterClass[class_name]
-    except KeyError:
+    character_class = CharacterClass.__members__.get(class_name)
+    if character_class is None:
         print("Неверный класс персонажа!")
         return
 
@@ -477,13 +563,7 @@ def main():
     starting_armor = starting_equipment_chest.get_armor()
     starting_weapon = starting_equipment_chest.get_weapon()
 
-    # Создаем персонажа через строитель
-    player = (PlayableCharacter.Builder()
-              .set_name(name)
-              .set_character_class(character_class)
-              .set_armor(starting_armor)
-              .set_weapon(starting_weapon)
-              .build())
+    player = PlayableCharacter(name, character_class, starting_weapon, starting_armor)
 
     game_logger = GameLogger()
     game_logger.log(f"{player.name} очнулся на распутье!")
@@ -508,7 +588,7 @@ def main():
             break
 
         # Шанс оглушения врага
-        stunned = random.choice([True, False])
+        stunned = _random() < 0.5
         if stunned:
             game_logger.log(f"{enemy.name} был оглушен атакой {player.name}!")
             continue
@@ -1,9 +1,42 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from types import MappingProxyType, SimpleNamespace
+import functools
 import random
 import pickle
-import os
-from typing import Dict
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Вероятностные проверки сравнивают случайные биты с целочисленным порогом
+_ROLL_BITS = 30
+
+
+def _roll_threshold(probability: float) -> int:
+    """Порог для проверки random.getrandbits(_ROLL_BITS) < порог"""
+    return int(probability * (1 << _ROLL_BITS))
+
+
+# С вероятностью 30% на врага накладываются оба модификатора
+_SECOND_MODIFIER_THRESHOLD = _roll_threshold(0.3)
+
+
+# Снижение урона считается в целых числах: доля прошедшего урона хранится в процентах,
+# поэтому дробь точная. Половина округляется к четному, как round() в laba3
+_MITIGATION_DENOMINATOR = 100
+_MITIGATION_HALF = _MITIGATION_DENOMINATOR // 2
+
+
+def _mitigation_numerator(defense: float) -> int:
+    """Процент урона, проходящего через защиту defense"""
+    return round((1 - defense) * _MITIGATION_DENOMINATOR)
+
+
+def _mitigate(damage: int, numerator: int) -> int:
+    q, r = divmod(damage * numerator, _MITIGATION_DENOMINATOR)
+    return q + (r > _MITIGATION_HALF or (r == _MITIGATION_HALF and q & 1))
 
 
 # ===== 1. SINGLETON =====
@@ -12,19 +45,23 @@ class GameLogger:
     Паттерн Одиночка - гарантирует, что у класса есть только один экземпляр
     """
     _instance = None
+    enabled: bool = True
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
-        if not hasattr(self, '_initialized'):
-            self._initialized = True
-
-    def log(self, message: str):
-        """Метод для логирования игровых событий"""
-        print(f"[GAME LOG]: {message}")
+    def log(self, message: str, *args):
+        """
+        Метод для логирования игровых событий.
+        Аргументы подставляются в message через % только при включенном логе
+        """
+        if not self.enabled:
+            return
+        if args:
+            message = message % args
+        sys.stdout.write("[GAME LOG]: " + message + "\n")
 
 
 # ===== 2. ENUMS =====
@@ -39,9 +76,18 @@ class CharacterClass(Enum):
         return self.value
 
 
+_CHARACTER_CLASSES = tuple(CharacterClass)
+_CLASS_NAMES = tuple(cls.name for cls in _CHARACTER_CLASSES)
+# Строка выбора класса собирается один раз, вид для игрока прежний: ['WARRIOR', ...]
+_CLASS_PROMPT = f"Выберите класс из списка: {list(_CLASS_NAMES)}"
+
+
 # ===== 3. ABSTRACT INTERFACES =====
 class Weapon(ABC):
     """Абстрактный класс оружия"""
+    __slots__ = ()
+
+    _logger = GameLogger()
 
     @abstractmethod
     def get_damage(self) -> int:
@@ -54,6 +100,13 @@ class Weapon(ABC):
 
 class Armor(ABC):
     """Абстрактный класс брони"""
+    __slots__ = ()
+
+    _logger = GameLogger()
+
+    def get_mitigated(self, damage: int) -> int:
+        """Урон, прошедший через броню"""
+        return _mitigate(damage, self._mitigation_numerator)
 
     @abstractmethod
     def get_defense(self) -> float:
@@ -66,12 +119,14 @@ class Armor(ABC):
 
 class Enemy(ABC):
     """Абстрактный класс врага"""
+    __slots__ = ('_name', '_health', '_damage')
+
+    _logger = GameLogger()
 
     def __init__(self):
         self._name = ""
         self._health = 0
         self._damage = 0
-        self._logger = GameLogger()
 
     @property
     def name(self):
@@ -96,10 +151,10 @@ class Enemy(ABC):
 # ===== 4. WEAPON IMPLEMENTATIONS =====
 class Sword(Weapon):
     """Меч - оружие воина"""
+    __slots__ = ('_damage',)
 
     def __init__(self):
         self._damage = 20
-        self._logger = GameLogger()
 
     def get_damage(self) -> int:
         return self._damage
@@ -110,16 +165,18 @@ class Sword(Weapon):
 
 class Bow(Weapon):
     """Лук - оружие вора"""
+    __slots__ = ('_rng', '_damage', '_critical_chance', '_critical_threshold', '_critical_modifier')
 
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
+        # По умолчанию броски идут через модуль random, для симуляции можно подставить свой генератор
+        self._rng = rng if rng is not None else random
         self._damage = 15
         self._critical_chance = 0.3
+        self._critical_threshold = _roll_threshold(self._critical_chance)
         self._critical_modifier = 2
-        self._logger = GameLogger()
 
     def get_damage(self) -> int:
-        roll = random.random()
-        if roll <= self._critical_chance:
+        if self._rng.getrandbits(_ROLL_BITS) < self._critical_threshold:
             self._logger.log("Критический урон!")
             return self._damage * self._critical_modifier
         return self._damage
@@ -130,14 +187,15 @@ class Bow(Weapon):
 
 class Staff(Weapon):
     """Посох - оружие мага"""
+    __slots__ = ('_rng', '_damage', '_scatter')
 
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng if rng is not None else random
         self._damage = 25
         self._scatter = 0.2
-        self._logger = GameLogger()
 
     def get_damage(self) -> int:
-        roll = random.random()
+        roll = self._rng.random()
         factor = 1 + (roll * 2 * self._scatter - self._scatter)
         return round(self._damage * factor)
 
@@ -148,10 +206,11 @@ class Staff(Weapon):
 # ===== 5. ARMOR IMPLEMENTATIONS =====
 class HeavyArmor(Armor):
     """Тяжелая броня"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._defense = 0.3
-        self._logger = GameLogger()
+    # Защита одинакова у всех экземпляров, поэтому числитель считается один раз на класс
+    _defense = 0.3
+    _mitigation_numerator = _mitigation_numerator(_defense)
 
     def get_defense(self) -> float:
         return self._defense
@@ -162,10 +221,11 @@ class HeavyArmor(Armor):
 
 class LightArmor(Armor):
     """Легкая броня"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._defense = 0.2
-        self._logger = GameLogger()
+    # Защита одинакова у всех экземпляров, поэтому числитель считается один раз на класс
+    _defense = 0.2
+    _mitigation_numerator = _mitigation_numerator(_defense)
 
     def get_defense(self) -> float:
         return self._defense
@@ -176,10 +236,11 @@ class LightArmor(Armor):
 
 class Robe(Armor):
     """Роба мага"""
+    __slots__ = ()
 
-    def __init__(self):
-        self._defense = 0.1
-        self._logger = GameLogger()
+    # Защита одинакова у всех экземпляров, поэтому числитель считается один раз на класс
+    _defense = 0.1
+    _mitigation_numerator = _mitigation_numerator(_defense)
 
     def get_defense(self) -> float:
         return self._defense
@@ -193,17 +254,20 @@ class PlayableCharacter:
     """
     Паттерн Строитель - для создания сложных объектов пошагово
     """
+    __slots__ = ('_name', '_character_class', '_weapon', '_armor', '_health')
+
+    _logger = GameLogger()
 
     def __init__(self, builder):
-        self._logger = GameLogger()
         self._name = builder._name
         self._character_class = builder._character_class
         self._weapon = builder._weapon
         self._armor = builder._armor
-        self._health = builder._character_class.starting_health
+        self._health = builder._character_class.value  # значение класса - стартовое здоровье
 
     class Builder:
         """Внутренний класс-строитель"""
+        __slots__ = ('_name', '_character_class', '_weapon', '_armor')
 
         def __init__(self):
             self._name = None
@@ -241,19 +305,18 @@ class PlayableCharacter:
 
     def take_damage(self, damage: int):
         """Логика получения урона"""
-        reduced_damage = round(damage * (1 - self._armor.get_defense()))
-        reduced_damage = max(0, reduced_damage)
+        reduced_damage = max(0, self._armor.get_mitigated(damage))
 
         self._health -= reduced_damage
         self._armor.use()
-        self._logger.log(f"{self._name} получил урон: {reduced_damage}")
+        self._logger.log("%s получил урон: %s", self._name, reduced_damage)
 
         if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+            self._logger.log("У %s осталось %s здоровья", self._name, self._health)
 
     def attack(self, enemy: Enemy):
         """Атака врага"""
-        self._logger.log(f"{self._name} атакует врага {enemy.name}")
+        self._logger.log("%s атакует врага %s", self._name, enemy.name)
         self._weapon.use()
         enemy.take_damage(self._weapon.get_damage())
 
@@ -266,7 +329,7 @@ class EquipmentChest(ABC):
     """Абстрактная фабрика для создания снаряжения"""
 
     @abstractmethod
-    def get_weapon(self) -> Weapon:
+    def get_weapon(self, rng: Optional[random.Random] = None) -> Weapon:
         pass
 
     @abstractmethod
@@ -277,8 +340,8 @@ class EquipmentChest(ABC):
 class WarriorEquipmentChest(EquipmentChest):
     """Фабрика для снаряжения воина"""
 
-    def get_weapon(self) -> Weapon:
-        return Sword()
+    def get_weapon(self, rng: Optional[random.Random] = None) -> Weapon:
+        return Sword()  # урон меча не случаен, генератор ему не нужен
 
     def get_armor(self) -> Armor:
         return HeavyArmor()
@@ -287,8 +350,8 @@ class WarriorEquipmentChest(EquipmentChest):
 class ThiefEquipmentChest(EquipmentChest):
     """Фабрика для снаряжения вора"""
 
-    def get_weapon(self) -> Weapon:
-        return Bow()
+    def get_weapon(self, rng: Optional[random.Random] = None) -> Weapon:
+        return Bow(rng)
 
     def get_armor(self) -> Armor:
         return LightArmor()
@@ -297,15 +360,25 @@ class ThiefEquipmentChest(EquipmentChest):
 class MagicalEquipmentChest(EquipmentChest):
     """Фабрика для снаряжения мага"""
 
-    def get_weapon(self) -> Weapon:
-        return Staff()
+    def get_weapon(self, rng: Optional[random.Random] = None) -> Weapon:
+        return Staff(rng)
 
     def get_armor(self) -> Armor:
         return Robe()
 
 
+# Сундуки не хранят состояния, поэтому создаются один раз на все вызовы
+_CHESTS = MappingProxyType({
+    CharacterClass.WARRIOR: WarriorEquipmentChest(),
+    CharacterClass.THIEF: ThiefEquipmentChest(),
+    CharacterClass.MAGE: MagicalEquipmentChest()
+})
+
+
 # ===== 8. ENEMY IMPLEMENTATIONS =====
 class Goblin(Enemy):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self._name = "Гоблин"
@@ -313,30 +386,33 @@ class Goblin(Enemy):
         self._damage = 10
 
     def take_damage(self, damage: int):
-        self._logger.log(f"{self._name} получает {damage} урона!")
+        self._logger.log("%s получает %s урона!", self._name, damage)
         self._health -= damage
         if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+            self._logger.log("У %s осталось %s здоровья", self._name, self._health)
 
     def attack(self, player):
-        self._logger.log(f"{self._name} атакует {player.name}!")
+        self._logger.log("%s атакует %s!", self._name, player.name)
         player.take_damage(self._damage)
 
 
 class Dragon(Enemy):
+    __slots__ = ('_resistance', '_damage_numerator')
+
     def __init__(self):
         super().__init__()
         self._name = "Дракон"
         self._resistance = 0.2
+        self._damage_numerator = _mitigation_numerator(self._resistance)
         self._health = 100
         self._damage = 30
 
     def take_damage(self, damage: int):
-        damage = round(damage * (1 - self._resistance))
-        self._logger.log(f"{self._name} получает {damage} урона!")
+        damage = _mitigate(damage, self._damage_numerator)
+        self._logger.log("%s получает %s урона!", self._name, damage)
         self._health -= damage
         if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+            self._logger.log("У %s осталось %s здоровья", self._name, self._health)
 
     def attack(self, player):
         self._logger.log("Дракон дышит огнем!")
@@ -347,21 +423,20 @@ class Dragon(Enemy):
 class Location(ABC):
     """Абстрактный класс локации с фабричным методом"""
 
-    def __init__(self):
-        self._game_logger = GameLogger()
+    _game_logger = GameLogger()
 
     def enter_location(self, player) -> Enemy:
         """Общая логика входа в локацию"""
-        self._game_logger.log(f"{player.name} отправился в {self.get_location_name()}")
+        self._game_logger.log("%s отправился в %s", player.name, self.get_location_name())
 
         enemy = self.spawn_enemy()  # Фабричный метод
-        self._game_logger.log(f"У {player.name} на пути возникает {enemy.name}, начинается бой!")
+        self._game_logger.log("У %s на пути возникает %s, начинается бой!", player.name, enemy.name)
 
         return enemy
 
     @abstractmethod
-    def spawn_enemy(self) -> Enemy:
-        """Фабричный метод - создание врага"""
+    def spawn_enemy(self, rng: Optional[random.Random] = None) -> Enemy:
+        """Фабричный метод - создание врага, rng позволяет зафиксировать случайность"""
         pass
 
     @abstractmethod
@@ -370,7 +445,7 @@ class Location(ABC):
 
 
 class Forest(Location):
-    def spawn_enemy(self) -> Enemy:
+    def spawn_enemy(self, rng: Optional[random.Random] = None) -> Enemy:
         return Goblin()  # Реализация фабричного метода
 
     def get_location_name(self) -> str:
@@ -378,7 +453,7 @@ class Forest(Location):
 
 
 class DragonBarrow(Location):
-    def spawn_enemy(self) -> Enemy:
+    def spawn_enemy(self, rng: Optional[random.Random] = None) -> Enemy:
         return Dragon()  # Реализация фабричного метода
 
     def get_location_name(self) -> str:
@@ -386,8 +461,13 @@ class DragonBarrow(Location):
 
 
 # ===== 10. ДЕКОРАТОР (ЛАБА 4) =====
+_LEGENDARY_PREFIX = "Легендарный "
+_WINDFURY_PREFIX = "Обладающий Неистовством Ветра "
+
+
 class BaseEnemyDecorator(Enemy):
     """Базовый декоратор для врагов"""
+    __slots__ = ('_wrapee',)
 
     def __init__(self, wrapee: Enemy):
         super().__init__()
@@ -413,14 +493,17 @@ class BaseEnemyDecorator(Enemy):
 
 class LegendaryEnemyDecorator(BaseEnemyDecorator):
     """Декоратор легендарного врага - добавляет дополнительный урон"""
+    __slots__ = ('_additional_damage',)
 
     def __init__(self, wrapee: Enemy):
         super().__init__(wrapee)
         self._additional_damage = 20
+        # Обертка не меняется после создания, поэтому имя собирается один раз
+        self._name = _LEGENDARY_PREFIX + wrapee.name
 
     @property
     def name(self):
-        return f"Легендарный {super().name}"
+        return self._name
 
     def attack(self, player):
         super().attack(player)
@@ -430,13 +513,15 @@ class LegendaryEnemyDecorator(BaseEnemyDecorator):
 
 class WindfuryEnemyDecorator(BaseEnemyDecorator):
     """Декоратор неистовства ветра - добавляет вторую атаку"""
+    __slots__ = ()
 
     def __init__(self, wrapee: Enemy):
         super().__init__(wrapee)
+        self._name = _WINDFURY_PREFIX + wrapee.name
 
     @property
     def name(self):
-        return f"Обладающий Неистовством Ветра {super().name}"
+        return self._name
 
     def attack(self, player):
         super().attack(player)
@@ -444,32 +529,82 @@ class WindfuryEnemyDecorator(BaseEnemyDecorator):
         super().attack(player)
 
 
+class CompositeEnemyDecorator(BaseEnemyDecorator):
+    """
+    Оба модификатора в одном декораторе - вместо стопки из нескольких оберток.
+    legendary_inner повторяет порядок Windfury(Legendary(враг)): тогда
+    дополнительный урон наносится после каждого удара, а не один раз
+    """
+    __slots__ = ('_legendary', '_windfury', '_legendary_inner', '_additional_damage')
+
+    def __init__(self, wrapee: Enemy, legendary: bool, windfury: bool, legendary_inner: bool = False):
+        super().__init__(wrapee)
+        self._legendary = legendary
+        self._windfury = windfury
+        self._legendary_inner = legendary and windfury and legendary_inner
+        self._additional_damage = 20
+
+        prefixes = []
+        if legendary and not self._legendary_inner:
+            prefixes.append(_LEGENDARY_PREFIX)
+        if windfury:
+            prefixes.append(_WINDFURY_PREFIX)
+        if self._legendary_inner:
+            prefixes.append(_LEGENDARY_PREFIX)
+        prefixes.append(wrapee.name)
+        self._name = "".join(prefixes)
+
+    @property
+    def name(self):
+        return self._name
+
+    def _legendary_strike(self, player):
+        self._logger.log("Враг легендарный и наносит дополнительный урон!!!")
+        player.take_damage(self._additional_damage)
+
+    def attack(self, player):
+        self._wrapee.attack(player)
+        if self._legendary_inner:
+            self._legendary_strike(player)
+
+        if self._windfury:
+            self._logger.log("Неистовство ветра позволяет врагу атаковать второй раз!!!")
+            self._wrapee.attack(player)
+            if self._legendary_inner:
+                self._legendary_strike(player)
+
+        if self._legendary and not self._legendary_inner:
+            self._legendary_strike(player)
+
+
 # ===== 11. АДАПТЕР (ЛАБА 4) =====
 class WeaponToEnemyAdapter(Enemy):
     """Адаптер для преобразования оружия во врага"""
+    __slots__ = ('_weapon', '_rng', '_dispel_probability', '_dispel_threshold')
 
-    def __init__(self, weapon: Weapon):
+    def __init__(self, weapon: Weapon, rng: Optional[random.Random] = None):
         super().__init__()
+        self._rng = rng if rng is not None else random
         self._name = "Магическое оружие"
         self._health = 50
         self._weapon = weapon
         self._damage = weapon.get_damage()
         self._dispel_probability = 0.2
+        self._dispel_threshold = _roll_threshold(self._dispel_probability)
 
     def take_damage(self, damage: int):
-        self._logger.log(f"{self._name} получает {damage} урона!")
+        self._logger.log("%s получает %s урона!", self._name, damage)
         self._health -= damage
 
-        dispel_roll = random.random()
-        if dispel_roll <= self._dispel_probability:
+        if self._rng.getrandbits(_ROLL_BITS) < self._dispel_threshold:
             self._logger.log("Атака рассеяла заклятие с оружия!")
             self._health = 0
 
         if self._health > 0:
-            self._logger.log(f"У {self._name} осталось {self._health} здоровья")
+            self._logger.log("У %s осталось %s здоровья", self._name, self._health)
 
     def attack(self, player):
-        self._logger.log(f"{self._name} атакует {player.name}!")
+        self._logger.log("%s атакует %s!", self._name, player.name)
         player.take_damage(self._damage)
 
 
@@ -480,27 +615,37 @@ class WeaponEquipmentFacade:
     def __init__(self, character_class: CharacterClass):
         self._character_class = character_class
 
-        if character_class == CharacterClass.WARRIOR:
-            self._equipment_chest = WarriorEquipmentChest()
-        elif character_class == CharacterClass.THIEF:
-            self._equipment_chest = ThiefEquipmentChest()
-        elif character_class == CharacterClass.MAGE:
-            self._equipment_chest = MagicalEquipmentChest()
-        else:
+        try:
+            self._equipment_chest = _CHESTS[character_class]
+        except KeyError:
             raise ValueError("Неизвестный класс персонажа")
 
-    def get_weapon(self) -> Weapon:
-        return self._equipment_chest.get_weapon()
+    def get_weapon(self, rng: Optional[random.Random] = None) -> Weapon:
+        return self._equipment_chest.get_weapon(rng)
+
+
+@functools.lru_cache(maxsize=None)
+def _facade_for(character_class: CharacterClass) -> WeaponEquipmentFacade:
+    """Фасад не хранит изменяемого состояния, поэтому на каждый класс создается один раз"""
+    return WeaponEquipmentFacade(character_class)
 
 
 # ===== 13. ПРОКСИ (ЛАБА 4) =====
 class PlayerProfile:
     """POJO с информацией об игроке"""
+    __slots__ = ("name", "score")
 
     def __init__(self, name: str, score: int = 0):
         self.name = name
         self.score = score
 
+    def to_dict(self) -> dict:
+        return {"name": self.name, "score": self.score}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlayerProfile":
+        return cls(data["name"], data["score"])
+
 
 class PlayerProfileRepository(ABC):
     """Интерфейс репозитория для работы с профилями"""
@@ -513,102 +658,134 @@ class PlayerProfileRepository(ABC):
     def update_high_score(self, name: str, score: int):
         pass
 
+    @abstractmethod
+    def flush(self):
+        pass
+
+
+class _LegacyProfileUnpickler(pickle.Unpickler):
+    """
+    Читает старый score.pkl независимо от модуля, в котором был объявлен PlayerProfile.
+    Другие глобальные имена в старой базе не встречаются, поэтому они запрещены:
+    иначе подмененный файл мог бы выполнить произвольный код при загрузке
+    """
+
+    def find_class(self, module, name):
+        if name == "PlayerProfile":
+            return SimpleNamespace
+        raise pickle.UnpicklingError(f"Недопустимый объект в старой базе данных: {module}.{name}")
+
 
 class PlayerProfileDBRepository(PlayerProfileRepository):
     """Реализация репозитория через хранение в файле"""
 
     def __init__(self):
-        self._score_filename = "score.pkl"
+        self._score_filename = "score.json"
+        self._legacy_score_filename = "score.pkl"
+        self._score_path = Path(self._score_filename)
+        self._legacy_score_path = Path(self._legacy_score_filename)
         self._initialize_db()
 
+        # Файл читается один раз, дальше работа идет с профилями в памяти.
+        # Изменения записываются только явным вызовом flush()
+        self._profiles = self._find_all()
+        self._dirty = False
+
     def _initialize_db(self):
         """Инициализация базы данных"""
-        if not os.path.exists(self._score_filename):
-            empty_db = {}
-            self._update_db(empty_db)
+        if not self._score_path.exists():
+            self._update_db(self._migrate_legacy_db())
+
+    def _migrate_legacy_db(self) -> Dict[str, PlayerProfile]:
+        """Одноразовый перенос профилей из старой pickle-базы"""
+        if not self._legacy_score_path.exists():
+            return {}
+
+        print("Профили переносятся из старой базы данных...")
+        try:
+            with self._legacy_score_path.open('rb') as f:
+                legacy_profiles = _LegacyProfileUnpickler(f).load()
+        except Exception as e:
+            raise RuntimeError(f"Ошибка чтения старой базы данных: {e}")
+
+        return {name: PlayerProfile(profile.name, profile.score)
+                for name, profile in legacy_profiles.items()}
 
     def get_profile(self, name: str) -> PlayerProfile:
-        print("Из базы данных достается информация о профилях игроков..")
-        player_profile_map = self._find_all()
+        print("Профиль игрока берется из загруженной базы данных...")
 
-        if name not in player_profile_map:
-            print("В базе данных создается новый профиль...")
-            player_profile_map[name] = PlayerProfile(name, 0)
-            self._update_db(player_profile_map)
+        if name not in self._profiles:
+            print("Создается новый профиль игрока...")
+            self._profiles[name] = PlayerProfile(name, 0)
+            self._dirty = True
 
-        return player_profile_map[name]
+        return self._profiles[name]
 
     def update_high_score(self, name: str, score: int):
-        print("В базе данных обновляются очки игрока...")
-        player_profile_map = self._find_all()
+        print("Очки игрока обновляются, в файл они попадут при сохранении...")
 
-        if name not in player_profile_map:
-            print("В базе данных создается новый профиль...")
-            player_profile_map[name] = PlayerProfile(name, 0)
+        if name not in self._profiles:
+            print("Создается новый профиль игрока...")
+            self._profiles[name] = PlayerProfile(name, 0)
 
-        player_profile_map[name].score = score
-        self._update_db(player_profile_map)
+        self._profiles[name].score = score
+        self._dirty = True
+
+    def flush(self):
+        """Запись накопленных изменений в файл"""
+        if self._dirty:
+            print("Изменения профилей записываются в файл...")
+            self._update_db(self._profiles)
+            self._dirty = False
 
     def _find_all(self) -> Dict[str, PlayerProfile]:
         """Чтение всех профилей из файла"""
         try:
-            with open(self._score_filename, 'rb') as f:
-                scores = pickle.load(f)
-                return scores
+            raw_scores = json.loads(self._score_path.read_text(encoding='utf-8'))
+            return {name: PlayerProfile.from_dict(data) for name, data in raw_scores.items()}
         except Exception as e:
             raise RuntimeError(f"Ошибка чтения базы данных: {e}")
 
     def _update_db(self, scores: Dict[str, PlayerProfile]):
         """Обновление базы данных"""
         try:
-            with open(self._score_filename, 'wb') as f:
-                pickle.dump(scores, f)
+            raw_scores = {name: profile.to_dict() for name, profile in scores.items()}
+            self._score_path.write_text(json.dumps(raw_scores, ensure_ascii=False), encoding='utf-8')
         except Exception as e:
             raise RuntimeError(f"Ошибка записи в базу данных: {e}")
 
 
 class PlayerProfileCacheRepository(PlayerProfileRepository):
-    """Кеширующая прокси для репозитория профилей"""
+    """
+    Прокси для репозитория профилей.
+    Профили уже хранятся в памяти PlayerProfileDBRepository, поэтому прокси
+    ничего не кеширует и передает вызовы напрямую
+    """
 
     def __init__(self):
-        self._cached_profiles: Dict[str, PlayerProfile] = {}
         self._database = PlayerProfileDBRepository()
 
     def get_profile(self, name: str) -> PlayerProfile:
-        if name not in self._cached_profiles:
-            print("Профиль игрока не найден в кеше...")
-            player_profile_from_database = self._database.get_profile(name)
-            self._cached_profiles[name] = player_profile_from_database
-
-        print("Профиль игрока достается из кеша...")
-        return self._cached_profiles[name]
+        return self._database.get_profile(name)
 
     def update_high_score(self, name: str, score: int):
-        if name not in self._cached_profiles:
-            print("Профиль игрока не найден в кеше...")
-            self._database.update_high_score(name, score)
-            player_profile_from_database = self._database.get_profile(name)
-            self._cached_profiles[name] = player_profile_from_database
-            return
-
-        # write-through кеш - пишет сначала в кеш, а потом в БД
-        cached_profile = self._cached_profiles[name]
-        cached_profile.score = score
+        # Профиль обновляется в памяти, в файл он попадет при flush()
         self._database.update_high_score(name, score)
 
+    def flush(self):
+        self._database.flush()
+
 
 # ===== 14. НОВАЯ ЛОКАЦИЯ (ЛАБА 4) =====
 class HauntedManor(Location):
     """Проклятый особняк - новая локация"""
 
-    def __init__(self):
-        super().__init__()
-        random_class = random.choice(list(CharacterClass))
-        self._weapon_equipment_facade = WeaponEquipmentFacade(random_class)
-
-    def spawn_enemy(self) -> Enemy:
-        weapon = self._weapon_equipment_facade.get_weapon()
-        enchanted_weapon = WeaponToEnemyAdapter(weapon)
+    def spawn_enemy(self, rng: Optional[random.Random] = None) -> Enemy:
+        # Класс оружия выбирается при появлении врага, поэтому локация не хранит состояния
+        rng = rng if rng is not None else random
+        weapon_equipment_facade = _facade_for(rng.choice(_CHARACTER_CLASSES))
+        weapon = weapon_equipment_facade.get_weapon(rng)
+        enchanted_weapon = WeaponToEnemyAdapter(weapon, rng)
         return enchanted_weapon
 
     def get_location_name(self) -> str:
@@ -645,13 +822,7 @@ def test_builder():
 def test_abstract_factory():
     """Демонстрация работы Абстрактной фабрики"""
     print("=== Демонстрация Abstract Factory ===")
-    factories = {
-        CharacterClass.WARRIOR: WarriorEquipmentChest(),
-        CharacterClass.THIEF: ThiefEquipmentChest(),
-        CharacterClass.MAGE: MagicalEquipmentChest()
-    }
-
-    for char_class, factory in factories.items():
+    for char_class, factory in _CHESTS.items():
         weapon = factory.get_weapon()
         armor = factory.get_armor()
         print(f"{char_class.name}: {weapon.__class__.__name__} + {armor.__class__.__name__}")
@@ -720,8 +891,8 @@ def test_facade():
     print("=== Демонстрация Facade ===")
 
     # Используем фасад для получения оружия
-    for char_class in CharacterClass:
-        facade = WeaponEquipmentFacade(char_class)
+    for char_class in _CHARACTER_CLASSES:
+        facade = _facade_for(char_class)
         weapon = facade.get_weapon()
         print(f"Фасад для {char_class.name}: {weapon.__class__.__name__} (урон: {weapon.get_damage()})")
     print()
@@ -732,49 +903,56 @@ def test_proxy():
     print("=== Демонстрация Proxy ===")
 
     # Очищаем старые данные для демонстрации
-    if os.path.exists("score.pkl"):
-        os.remove("score.pkl")
+    for filename in ("score.json", "score.pkl"):
+        Path(filename).unlink(missing_ok=True)
 
     # Создаем прокси-репозиторий
     proxy_repository = PlayerProfileCacheRepository()
 
-    print("Первый запрос профиля (должен идти в БД):")
+    print("Первый запрос профиля (профиль создается в памяти):")
     profile1 = proxy_repository.get_profile("test_player")
     print(f"Профиль: {profile1.name}, счет: {profile1.score}")
 
-    print("\nВторой запрос того же профиля (должен браться из кеша):")
+    print("\nВторой запрос того же профиля (возвращается тот же объект):")
     profile2 = proxy_repository.get_profile("test_player")
-    print(f"Профиль: {profile2.name}, счет: {profile2.score}")
+    print(f"Профиль: {profile2.name}, счет: {profile2.score}, тот же объект: {profile1 is profile2}")
 
     print("\nОбновление счета:")
     proxy_repository.update_high_score("test_player", 100)
 
-    print("\nТретий запрос (из кеша):")
+    print("\nТретий запрос (после обновления счета):")
     profile3 = proxy_repository.get_profile("test_player")
     print(f"Профиль: {profile3.name}, счет: {profile3.score}")
+
+    print("\nСохранение изменений:")
+    proxy_repository.flush()
     print()
 
 
 def get_chest(character_class: CharacterClass) -> EquipmentChest:
     """Фабричный метод для получения сундука снаряжения"""
-    chests = {
-        CharacterClass.WARRIOR: WarriorEquipmentChest(),
-        CharacterClass.THIEF: ThiefEquipmentChest(),
-        CharacterClass.MAGE: MagicalEquipmentChest()
-    }
-    return chests.get(character_class)
+    return _CHESTS[character_class]
+
+
+# Таблицы по названию локации в нижнем регистре, строятся один раз.
+# Локации не хранят состояния, поэтому их экземпляры общие
+_LOCATIONS = {
+    "мистический лес": Forest(),
+    "проклятый особняк": HauntedManor(),
+    "логово дракона": DragonBarrow()
+}
+
+_LOCATION_SCORES = {
+    "мистический лес": 10,
+    "проклятый особняк": 50,
+    "логово дракона": 100
+}
 
 
 def get_location(location_name: str) -> Location:
     """Фабричный метод для получения локации"""
-    locations = {
-        "мистический лес": Forest(),
-        "проклятый особняк": HauntedManor(),
-        "логово дракона": DragonBarrow()
-    }
-
-    location = locations.get(location_name.lower())
-    if not location:
+    location = _LOCATIONS.get(location_name.casefold())
+    if location is None:
         raise ValueError("Неизвестная локация!")
 
     return location
@@ -782,35 +960,20 @@ def get_location(location_name: str) -> Location:
 
 def add_enemy_modifiers(enemy: Enemy) -> Enemy:
     """Добавляет модификаторы к врагу с определенной вероятностью"""
-    decorator = BaseEnemyDecorator(enemy)
+    second_modifier_proc = random.getrandbits(_ROLL_BITS) < _SECOND_MODIFIER_THRESHOLD
 
-    # С вероятностью 30% на врага накладывается оба модификатора
-    second_modifier_probability = 0.3
-    second_modifier_proc = random.random() <= second_modifier_probability
+    if random.getrandbits(1):
+        # Легендарный модификатор первый, неистовство ветра - поверх него
+        return CompositeEnemyDecorator(enemy, legendary=True, windfury=second_modifier_proc,
+                                       legendary_inner=True)
 
-    if random.choice([True, False]):
-        decorator = LegendaryEnemyDecorator(decorator)
-        if second_modifier_proc:
-            decorator = WindfuryEnemyDecorator(decorator)
-    else:
-        decorator = WindfuryEnemyDecorator(decorator)
-        if second_modifier_proc:
-            decorator = LegendaryEnemyDecorator(decorator)
-
-    return decorator
+    return CompositeEnemyDecorator(enemy, legendary=second_modifier_proc, windfury=True)
 
 
 def get_score(location_name: str, strong_enemy: bool) -> int:
     """Рассчитывает очки в зависимости от локации и модификаторов"""
-    base_score = 0
-
-    if location_name.lower() == "мистический лес":
-        base_score = 10
-    elif location_name.lower() == "проклятый особняк":
-        base_score = 50
-    elif location_name.lower() == "логово дракона":
-        base_score = 100
-    else:
+    base_score = _LOCATION_SCORES.get(location_name.casefold())
+    if base_score is None:
         raise ValueError("Неизвестная локация")
 
     if strong_enemy:
@@ -819,92 +982,140 @@ def get_score(location_name: str, strong_enemy: bool) -> int:
     return base_score
 
 
+def run_combat(player: PlayableCharacter, enemy: Enemy, rng: Optional[random.Random] = None,
+               interactive: bool = True) -> bool:
+    """
+    Бой игрока с врагом до смерти одного из них, возвращает True при победе игрока.
+    С interactive=False бой идет без ожидания ввода, а rng позволяет зафиксировать исход
+    """
+    getrandbits = rng.getrandbits if rng is not None else random.getrandbits
+    game_logger = GameLogger()
+
+    while player.is_alive() and enemy.is_alive():
+        if interactive:
+            input("Нажмите Enter чтобы атаковать! ")
+        player.attack(enemy)
+
+        if not enemy.is_alive():
+            break
+
+        # Шанс оглушения врага
+        stunned = bool(getrandbits(1))
+        if stunned:
+            game_logger.log("%s был оглушен атакой %s!", enemy.name, player.name)
+            continue
+
+        enemy.attack(player)
+
+    return player.is_alive()
+
+
+def simulate_fights(n: int, character_class: CharacterClass, location_name: str = "мистический лес",
+                    seed=None) -> float:
+    """Прогоняет n боев без ввода и логов, возвращает долю побед игрока"""
+    if n <= 0:
+        raise ValueError("Количество боев должно быть положительным")
+
+    # Все броски идут через один генератор, поэтому seed полностью фиксирует результат
+    rng = random.Random(seed)
+    chest = get_chest(character_class)
+    location = get_location(location_name)
+
+    game_logger = GameLogger()
+    logging_enabled = game_logger.enabled
+    game_logger.enabled = False
+    try:
+        wins = 0
+        for _ in range(n):
+            player = (PlayableCharacter.Builder()
+                      .set_name("Симуляция")
+                      .set_character_class(character_class)
+                      .set_weapon(chest.get_weapon(rng))
+                      .set_armor(chest.get_armor())
+                      .build())
+            wins += run_combat(player, location.spawn_enemy(rng), rng, interactive=False)
+    finally:
+        game_logger.enabled = logging_enabled
+
+    return wins / n
+
+
 # ===== 17. ОБНОВЛЕННЫЙ ОСНОВНОЙ КОД =====
 def main():
     """Обновленный основной игровой цикл"""
     print("=== ИГРА НАЧИНАЕТСЯ ===")
 
-    # Для работы с очками игрока используется кеширующая прокси
+    # Для работы с очками игрока используется прокси репозитория
     repository = PlayerProfileCacheRepository()
 
-    print("Создайте своего персонажа:")
-    name = input("Введите имя: ")
-
-    player_profile = repository.get_profile(name)
-    print(f"Текущий счет игрока {player_profile.name}: {player_profile.score}")
+    # Профили пишутся в файл только при flush(), поэтому сохранение выполняется
+    # при любом выходе из игры, в том числе по ошибке ввода или Ctrl-C
+    try:
+        print("Создайте своего персонажа:")
+        name = input("Введите имя: ")
 
-    print("Выберите класс из списка:", [cls.name for cls in CharacterClass])
-    class_name = input().upper()
+        player_profile = repository.get_profile(name)
+        print(f"Текущий счет игрока {player_profile.name}: {player_profile.score}")
 
-    try:
-        character_class = CharacterClass[class_name]
-    except KeyError:
-        print("Неверный класс персонажа!")
-        return
-
-    # Получаем снаряжение через абстрактную фабрику
-    starting_equipment_chest = get_chest(character_class)
-    starting_armor = starting_equipment_chest.get_armor()
-    starting_weapon = starting_equipment_chest.get_weapon()
-
-    # Создаем персонажа через строитель
-    player = (PlayableCharacter.Builder()
-              .set_name(name)
-              .set_character_class(character_class)
-              .set_armor(starting_armor)
-              .set_weapon(starting_weapon)
-              .build())
+        print(_CLASS_PROMPT)
+        class_name = input().upper()
 
-    game_logger = GameLogger()
-    game_logger.log(f"{player.name} очнулся на распутье!")
+        try:
+            character_class = CharacterClass[class_name]
+        except KeyError:
+            print("Неверный класс персонажа!")
+            return
 
-    print("Куда вы двинетесь? Выберите локацию: (мистический лес, проклятый особняк, логово дракона)")
-    location_name = input()
-    location = get_location(location_name)
+        # Получаем снаряжение через абстрактную фабрику
+        starting_equipment_chest = get_chest(character_class)
+        starting_armor = starting_equipment_chest.get_armor()
+        starting_weapon = starting_equipment_chest.get_weapon()
 
-    game_logger.log(f"{player.name} отправился в {location_name}")
+        # Создаем персонажа через строитель
+        player = (PlayableCharacter.Builder()
+                  .set_name(name)
+                  .set_character_class(character_class)
+                  .set_armor(starting_armor)
+                  .set_weapon(starting_weapon)
+                  .build())
 
-    enemy = location.enter_location(player)
+        game_logger = GameLogger()
+        game_logger.log("%s очнулся на распутье!", player.name)
 
-    # С шансом в 50% игрок встречает сильного врага
-    strong_enemy_curse = random.choice([True, False])
-    if strong_enemy_curse:
-        game_logger.log(f"Боги особенно немилостивы к {name}, сегодня его ждет страшная битва...")
-        enemy = add_enemy_modifiers(enemy)
+        print("Куда вы двинетесь? Выберите локацию: (мистический лес, проклятый особняк, логово дракона)")
+        location_name = input()
+        location = get_location(location_name)
 
-    game_logger.log(f"У {player.name} на пути возникает {enemy.name}, начинается бой!")
+        game_logger.log("%s отправился в %s", player.name, location_name)
 
-    # Игровой цикл
-    while player.is_alive() and enemy.is_alive():
-        input("Нажмите Enter чтобы атаковать! ")
-        player.attack(enemy)
+        enemy = location.enter_location(player)
 
-        if not enemy.is_alive():
-            break
+        # С шансом в 50% игрок встречает сильного врага
+        strong_enemy_curse = bool(random.getrandbits(1))
+        if strong_enemy_curse:
+            game_logger.log("Боги особенно немилостивы к %s, сегодня его ждет страшная битва...", name)
+            enemy = add_enemy_modifiers(enemy)
 
-        # Шанс оглушения врага
-        stunned = random.choice([True, False])
-        if stunned:
-            game_logger.log(f"{enemy.name} был оглушен атакой {player.name}!")
-            continue
+        game_logger.log("У %s на пути возникает %s, начинается бой!", player.name, enemy.name)
 
-        enemy.attack(player)
+        # Игровой цикл
+        player_won = run_combat(player, enemy)
 
-    print()
-    if not player.is_alive():
-        game_logger.log(f"{player.name} был убит...")
-        repository.update_high_score(name, 0)
-        player_profile = repository.get_profile(name)
-        print(f"Новый счет игрока {player_profile.name}: {player_profile.score}")
-        return
+        print()
+        if not player_won:
+            game_logger.log("%s был убит...", player.name)
+            repository.update_high_score(name, 0)
+            print(f"Новый счет игрока {name}: 0")
+            return
 
-    game_logger.log(f"Злой {enemy.name} был побежден! {player.name} отправился дальше по тропе судьбы...")
+        game_logger.log("Злой %s был побежден! %s отправился дальше по тропе судьбы...", enemy.name, player.name)
 
-    # Обновляем счет игрока в зависимости от локации и модификаторов врага
-    score = get_score(location_name, strong_enemy_curse)
-    repository.update_high_score(name, score)
-    player_profile = repository.get_profile(name)
-    print(f"Новый счет игрока {player_profile.name}: {player_profile.score}")
+        # Обновляем счет игрока в зависимости от локации и модификаторов врага
+        score = get_score(location_name, strong_enemy_curse)
+        repository.update_high_score(name, score)
+        print(f"Новый счет игрока {name}: {score}")
+    finally:
+        repository.flush()
 
 
 # Запуск обновленной игры
@@ -0,0 +1,72 @@
+from numba import njit, prange
+import numpy as np
+
+from laba3 import CharacterClass, Goblin, get_chest
+
+
+# ===== 1. ЯДРО СИМУЛЯЦИИ =====
+@njit(parallel=True, cache=True)
+def _simulate(hp_player, hp_enemy, player_damage, stun_rolls, armor_defense, enemy_damage,
+              enemy_resistance):
+    """
+    Пакетная симуляция боев, данные разложены по массивам (SoA).
+    player_damage[i, step] - урон оружия игрока, stun_rolls[i, step] - бросок оглушения.
+    Возвращает 1 для победы игрока и 0 для поражения или незавершенного боя.
+    """
+    n, n_steps = player_damage.shape[0], player_damage.shape[1]
+    wins = np.zeros(n, dtype=np.int8)
+    player_damage_taken = int(np.rint(enemy_damage * (1 - armor_defense)))
+    if player_damage_taken < 0:
+        player_damage_taken = 0
+
+    for i in prange(n):
+        hp1 = hp_player[i]
+        hp2 = hp_enemy[i]
+        for step in range(n_steps):
+            hp2 -= int(np.rint(player_damage[i, step] * (1 - enemy_resistance)))
+            if hp2 <= 0:
+                wins[i] = 1
+                break
+
+            # Оглушенный враг пропускает ход
+            if stun_rolls[i, step] < 0.5:
+                continue
+
+            hp1 -= player_damage_taken
+            if hp1 <= 0:
+                break
+
+    return wins
+
+
+# ===== 2. ТОЧКА ВХОДА =====
+def simulate_battles(n: int, character_class: CharacterClass, enemy_type=Goblin,
+                     n_steps: int = 16, seed=None) -> np.ndarray:
+    """Прогоняет n боев класса character_class против enemy_type без ввода и логов"""
+    chest = get_chest(character_class)
+    weapon = chest.get_weapon()
+    armor = chest.get_armor()
+    enemy = enemy_type()
+
+    # Все случайные числа бросаются заранее, вне JIT-ядра
+    rng = np.random.default_rng(seed)
+    player_damage = weapon.get_damage_batch(rng, (n, n_steps))
+    stun_rolls = rng.random((n, n_steps))
+
+    hp_player = np.full(n, character_class.starting_health, dtype=np.int64)
+    hp_enemy = np.full(n, enemy.health, dtype=np.int64)
+
+    return _simulate(hp_player, hp_enemy, player_damage, stun_rolls,
+                     armor.get_defense(),
+                     enemy._damage,
+                     getattr(enemy, "_resistance", 0.0))
+
+
+if __name__ == "__main__":
+    from laba3 import Dragon
+
+    for character_class in CharacterClass:
+        for enemy_type in (Goblin, Dragon):
+            wins = simulate_battles(100_000, character_class, enemy_type)
+            print(f"{character_class.name} против {enemy_type.__name__}: "
+                  f"побед {wins.mean():.1%}")